@@ -24,7 +24,6 @@ Implementation Notes
 """
 import time
 from micropython import const
-from simpleio import map_range
 
 try:
     from typing import Optional, Tuple, Union
@@ -43,12 +42,29 @@ __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_FONA.git"
 
 FONA_DEFAULT_TIMEOUT_MS = 500  # TODO: Check this against arduino...
+# Time to let a stale line from the previous command arrive before a new one,
+# the same silence the Arduino library's flushInput waits for
+_FLUSH_TIMEOUT_MS = const(40)
+
+# Set to 1 to trace the UART traffic when debug=True, at 0 the compiler
+# drops those prints from _uart_write and _read_line entirely
+_DEBUG = const(0)
+
+_CRLF = b"\r\n"
+# Longest line joined with its CRLF into one write, longer ones are not copied
+_JOIN_MAX = const(64)
 
 # Commands
 CMD_AT = b"AT"
+CMD_ATE0 = b"ATE0"  # echo off
+CMD_CMGF_TEXT = b"AT+CMGF=1"  # SMS text mode
+CMD_CIPRXGET_MANUAL = b"AT+CIPRXGET=1"  # receive data manually
+CMD_CIPSHUT = b"AT+CIPSHUT"  # deactivate GPRS PDP context
+CMD_CPMS_QUERY = b"AT+CPMS?"  # preferred SMS storage and usage
 # Replies
 REPLY_OK = b"OK"
 REPLY_AT = b"AT"
+REPLY_SHUT_OK = b"SHUT OK"
 
 # Maximum number of fona800 and fona808 sockets
 FONA_MAX_SOCKETS = const(6)
@@ -61,10 +77,59 @@ FONA_808_V1 = const(0x2)
 FONA_808_V2 = const(0x3)
 FONA_3G_A = const(0x4)
 FONA_3G_E = const(0x5)
+_FONA_3G_MODELS = (FONA_3G_A, FONA_3G_E)
+_FONA_GPS_MODELS = (FONA_3G_A, FONA_3G_E, FONA_808_V1, FONA_808_V2)
+
+# Module identification signatures, all starting with "SIM"
+_FONA_MODELS = (  # ATI
+    (b"SIM808 R14", FONA_808_V2),
+    (b"SIM808 R13", FONA_808_V1),
+    (b"SIMCOM_SIM5320A", FONA_3G_A),
+    (b"SIMCOM_SIM5320E", FONA_3G_E),
+)
+_FONA_800_MODELS = (  # AT+GMM, once ATI reported a SIM800
+    (b"SIM800H", FONA_800_H),
+    (b"SIM800L", FONA_800_L),
+    (b"SIM800C", FONA_800_C),
+)
+
+# +CSQ <rssi> to dBm, 0 is -115dBm or less and 31 is -52dBm or greater,
+# with 2dBm steps from 2 to 30
+_RSSI_DBM = (-115, -111) + tuple(range(-110, -53, 2)) + (-52,)
+
+# set_gprs scripts of (command, reply, timeout)
+_GPRS_SETUP = (
+    (b"AT+CIPMUX=1", REPLY_OK, FONA_DEFAULT_TIMEOUT_MS),  # multi connection mode
+    (CMD_CIPRXGET_MANUAL, REPLY_OK, FONA_DEFAULT_TIMEOUT_MS),
+    (CMD_CIPSHUT, REPLY_SHUT_OK, 20000),  # disconnect all sockets
+    (b"AT+CGATT=1", REPLY_OK, 10000),
+    (b'AT+SAPBR=3,1,"CONTYPE","GPRS"', REPLY_OK, 10000),  # bearer profile
+)
+_GPRS_OPEN = (
+    (b"AT+SAPBR=1,1", REPLY_OK, 1850),  # open GPRS context
+    (b"AT+CIICR", REPLY_OK, 10000),  # bring up wireless connection
+)
 
 # FONA preferred SMS storage
 FONA_SMS_STORAGE_SIM = b'"SM"'  # Storage on the SIM
 FONA_SMS_STORAGE_INTERNAL = b'"ME"'  # Internal storage on the FONA
+# Storages num_sms falls back to when the requested one is not reported
+_SMS_STORAGE_FALLBACKS = (b'"SM",', b'"SM_P",')
+
+
+def _match_model(buf: bytes, models: Tuple[Tuple[bytes, int], ...]) -> int:
+    """Returns the FONA version of the first signature found in buf, 0 if none.
+
+    Every signature starts with ``SIM``, so buf is scanned once for that
+    prefix and the table is only compared where it occurs.
+    """
+    pos = buf.find(b"SIM")
+    while pos != -1:
+        for signature, fona_type in models:
+            if buf.startswith(signature, pos):
+                return fona_type
+        pos = buf.find(b"SIM", pos + 3)
+    return 0
 
 
 # pylint: disable=too-many-instance-attributes, too-many-public-methods
@@ -74,7 +139,8 @@ class FONA:
     :param ~busio.UART uart: FONA UART connection.
     :param ~digitalio.DigitalInOut rst: FONA RST pin.
     :param ~digitalio.DigitalInOut ri: Optional FONA Ring Interrupt (RI) pin.
-    :param bool debug: Enable debugging output.
+    :param bool debug: Enable debugging output. Tracing the UART traffic
+        also needs ``_DEBUG`` set to 1 in ``adafruit_fona.adafruit_fona``.
     """
 
     TCP_MODE = const(0)  # TCP socket
@@ -89,7 +155,10 @@ class FONA:
         debug: bool = False,
     ) -> None:
         self._buf = b""  # shared buffer
+        self._rx_pending = b""  # bytes received past the end of the last line
+        self._line = memoryview(bytearray(254))  # line assembly for _read_line
         self._fona_type = 0
+        self._apn_cmds = None  # (apn, commands...) from the last set_gprs
         self._debug = debug
 
         self._uart = uart
@@ -105,59 +174,41 @@ class FONA:
         """Initializes FONA module."""
         self.reset()
 
-        timeout = 7000
-        while timeout > 0:
-            if self._send_check_reply(CMD_AT, reply=REPLY_OK):
-                break
-            if self._send_check_reply(CMD_AT, reply=REPLY_AT):
+        # wait for the modem to answer
+        deadline = time.monotonic() + 7
+        delay = 0.05
+        while time.monotonic() < deadline:
+            # a single probe, its first line is either the echo or the result
+            if self._get_reply(CMD_AT, timeout=200)[1] in (REPLY_OK, REPLY_AT):
                 break
-            time.sleep(0.5)
-            timeout -= 500
-
-        if timeout <= 0:  # no response to AT, last ditch attempt
-            self._send_check_reply(CMD_AT, reply=REPLY_OK)
-            time.sleep(0.1)
-            self._send_check_reply(CMD_AT, reply=REPLY_OK)
-            time.sleep(0.1)
-            self._send_check_reply(CMD_AT, reply=REPLY_OK)
-            time.sleep(0.1)
-
-        # turn off echo
-        self._send_check_reply(b"ATE0", reply=REPLY_OK)
-        time.sleep(0.1)
-
-        self._read_line()
-        if not self._send_check_reply(b"ATE0", reply=REPLY_OK):
-            return False
-
-        # turn on hangupitude
-        self._send_check_reply(b"AT+CVHU=0", reply=REPLY_OK)
-        time.sleep(0.1)
-
-        self._buf = b""
-        self._uart.reset_input_buffer()
+            time.sleep(delay)  # back off while the modem is still booting
+            delay = min(delay * 2, 0.5)
+
+        # turn off echo and turn on hangupitude, in a single round trip
+        if not self._send_batch((CMD_ATE0, b"AT+CVHU=0")):
+            # with echo still on, the first line back is the command itself
+            if self._buf.startswith(CMD_ATE0):
+                self._read_line()
+            if self._buf != REPLY_OK:
+                # one ERROR fails the whole line, so send them apart: only ATE0
+                # is required, hangupitude is not supported by every module
+                if not self._send_check_reply(CMD_ATE0, reply=REPLY_OK):
+                    if not self._buf.startswith(CMD_ATE0):
+                        return False
+                    if not self._expect_reply(REPLY_OK):
+                        return False
+                self._send_check_reply(b"AT+CVHU=0", reply=REPLY_OK)
+
+        self._reset_input_buffer()
 
         self._uart_write(b"ATI\r\n")
         self._read_line(multiline=True)
 
-        if self._buf.find(b"SIM808 R14") != -1:
-            self._fona_type = FONA_808_V2
-        elif self._buf.find(b"SIM808 R13") != -1:
-            self._fona_type = FONA_808_V1
-        elif self._buf.find(b"SIMCOM_SIM5320A") != -1:
-            self._fona_type = FONA_3G_A
-        elif self._buf.find(b"SIMCOM_SIM5320E") != -1:
-            self._fona_type = FONA_3G_E
-        elif self._buf.find(b"SIM800") != -1:
+        self._fona_type = _match_model(self._buf, _FONA_MODELS)
+        if not self._fona_type and b"SIM800" in self._buf:
             self._uart_write(b"AT+GMM\r\n")
             self._read_line(multiline=True)
-
-            if self._buf.find(b"SIM800H") != -1:
-                self._fona_type = FONA_800_H
-            elif self._buf.find(b"SIM800L") != -1:
-                self._fona_type = FONA_800_L
-            elif self._buf.find(b"SIM800C") != -1:
-                self._fona_type = FONA_800_C
+            self._fona_type = _match_model(self._buf, _FONA_800_MODELS)
 
         if self._debug and self._fona_type == 0:
             print(f"Unsupported module: {self._buf}")
@@ -184,10 +235,10 @@ class FONA:
         self._rst.value = True
 
     @property
-    # pylint: disable=too-many-return-statements
     def version(self) -> int:
-        """The version of the FONA module. Can be FONA_800_L,
-        FONA_800_H, FONA_808_V1, FONA_808_V2, FONA_3G_A, FONA3G_E.
+        """The version of the FONA module. Can be FONA_800_L, FONA_800_H,
+        FONA_800_C, FONA_808_V1, FONA_808_V2, FONA_3G_A, FONA_3G_E, or 0
+        if the module was not recognized.
         """
         return self._fona_type
 
@@ -196,23 +247,25 @@ class FONA:
         """FONA Module's IEMI (International Mobile Equipment Identity) number."""
         if self._debug:
             print("FONA IEMI")
-        self._uart.reset_input_buffer()
+        self._reset_input_buffer()
 
         self._uart_write(b"AT+GSN\r\n")
-        self._read_line(multiline=True)
-        iemi = self._buf[0:15]
-        return iemi.decode("utf-8")
+        iemi = self._read_line()[1][0:15].decode("ascii")
+        self._read_line()  # eat the 'ok'
+        return iemi
 
     @property
     def local_ip(self) -> Optional[str]:
         """Module's local IP address, None if not set."""
         self._uart_write(b"AT+CIFSR\r\n")
-        self._read_line()
+        # the reply is already a dotted quad, or ERROR when there is none
         try:
-            ip_addr = self.pretty_ip(self._buf)
+            ip_addr = self._read_line()[1].decode("ascii")
+            if len(self.unpretty_ip(ip_addr)) == 4:
+                return ip_addr
         except ValueError:
-            return None
-        return ip_addr
+            pass
+        return None
 
     @property
     def iccid(self) -> str:
@@ -220,8 +273,8 @@ class FONA:
         if self._debug:
             print("ICCID")
         self._uart_write(b"AT+CCID\r\n")
-        self._read_line(timeout=2000)  # 6.2.23, 2sec max. response time
-        iccid = self._buf.decode()
+        # 6.2.23, 2sec max. response time
+        iccid = self._read_line(timeout=2000)[1].decode("ascii")
         return iccid
 
     @property
@@ -245,73 +298,50 @@ class FONA:
         :param bool enable: Enables or disables GPRS.
         """
         if enable:
-            apn_name, apn_user, apn_pass = apn
-
-            # enable multi connection mode (3,1)
-            if not self._send_check_reply(b"AT+CIPMUX=1", reply=REPLY_OK):
-                return False
-            self._read_line()
-
-            # enable receive data manually (7,2)
-            if not self._send_check_reply(b"AT+CIPRXGET=1", reply=REPLY_OK):
-                return False
-
-            # disconnect all sockets
-            if not self._send_check_reply(
-                b"AT+CIPSHUT", reply=b"SHUT OK", timeout=20000
-            ):
+            if self._exec_script(_GPRS_SETUP) != len(_GPRS_SETUP):
                 return False
 
-            if not self._send_check_reply(b"AT+CGATT=1", reply=REPLY_OK, timeout=10000):
-                return False
-
-            # set bearer profile (APN)
-            if not self._send_check_reply(
-                b'AT+SAPBR=3,1,"CONTYPE","GPRS"', reply=REPLY_OK, timeout=10000
-            ):
-                return False
-
-            # Send command AT+SAPBR=3,1,"APN","<apn value>"
-            # where <apn value> is the configured APN value.
-            self._send_check_reply_quoted(
-                b'AT+SAPBR=3,1,"APN",', apn_name.encode(), REPLY_OK, 10000
-            )
-
-            # send AT+CSTT,"apn","user","pass"
-            self._uart.reset_input_buffer()
-
-            self._uart_write(b'AT+CSTT="' + apn_name.encode())
-
-            if apn_user is not None:
-                self._uart_write(b'","' + apn_user.encode())
-
-            if apn_pass is not None:
-                self._uart_write(b'","' + apn_pass.encode())
-            self._uart_write(b'"\r\n')
-
-            if not self._get_reply(REPLY_OK):
-                return False
-
-            # Set username
-            if not self._send_check_reply_quoted(
-                b'AT+SAPBR=3,1,"USER",', apn_user.encode(), REPLY_OK, 10000
-            ):
-                return False
-
-            # Set password
-            if not self._send_check_reply_quoted(
-                b'AT+SAPBR=3,1,"PWD",', apn_pass.encode(), REPLY_OK, 100000
-            ):
-                return False
+            if apn is not None:  # Configure APN
+                # assemble the APN commands once per APN, each goes out in a single write
+                if self._apn_cmds is None or self._apn_cmds[0] != apn:
+                    apn_name, apn_user, apn_pass = (
+                        None if item is None else item.encode() for item in apn
+                    )
+                    cstt = [b'AT+CSTT="', apn_name]
+                    credentials = []
+                    if apn_user is not None:
+                        cstt += [b'","', apn_user]
+                        credentials.append(b'AT+SAPBR=3,1,"USER","' + apn_user + b'"')
+                    if apn_pass is not None:
+                        cstt += [b'","', apn_pass]
+                        credentials.append(b'AT+SAPBR=3,1,"PWD","' + apn_pass + b'"')
+                    cstt.append(b'"\r\n')
+                    self._apn_cmds = (
+                        apn,
+                        b'AT+SAPBR=3,1,"APN","' + apn_name + b'"\r\n',
+                        b"".join(cstt),
+                        tuple(credentials),
+                    )
+                _, sapbr_apn, cstt, credentials = self._apn_cmds
+
+                # Send command AT+SAPBR=3,1,"APN","<apn value>"
+                # where <apn value> is the configured APN value.
+                self._reset_input_buffer()
+                self._uart_write(sapbr_apn)
+                self._read_line(10000)
+
+                # send AT+CSTT,"apn","user","pass"
+                self._reset_input_buffer()
+                self._uart_write(cstt)
+
+                if not self._expect_reply(REPLY_OK, FONA_DEFAULT_TIMEOUT_MS):
+                    return False
 
-            # Open GPRS context
-            if not self._send_check_reply(
-                b"AT+SAPBR=1,1", reply=REPLY_OK, timeout=1850
-            ):
-                return False
+                # Set username and password, when given
+                if credentials and not self._send_batch(credentials, timeout=10000):
+                    return False
 
-            # Bring up wireless connection
-            if not self._send_check_reply(b"AT+CIICR", reply=REPLY_OK, timeout=10000):
+            if self._exec_script(_GPRS_OPEN) != len(_GPRS_OPEN):
                 return False
 
             if not self.local_ip:
@@ -319,7 +349,7 @@ class FONA:
         else:
             # reset PDP state
             if not self._send_check_reply(
-                b"AT+CIPSHUT", reply=b"SHUT OK", timeout=20000
+                CMD_CIPSHUT, reply=REPLY_SHUT_OK, timeout=20000
             ):
                 return False
 
@@ -334,12 +364,12 @@ class FONA:
         if not self._send_parse_reply(b"AT+CREG?", b"+CREG: ", idx=1):
             return False
         status = self._buf
-        if not 0 <= self._buf <= 5:
-            status = -1
+        if not 0 <= status <= 5:
+            return -1
         return status
 
     @property
-    def rssi(self) -> float:
+    def rssi(self) -> int:
         """The received signal strength indicator for the cellular network
         we are connected to.
         """
@@ -349,16 +379,9 @@ class FONA:
             return False
 
         reply_num = self._buf
-        rssi = 0
-        if reply_num == 0:
-            rssi = -115
-        elif reply_num == 1:
-            rssi = -111
-        elif reply_num == 31:
-            rssi = -52
-
-        if 2 <= reply_num <= 30:
-            rssi = map_range(reply_num, 2, 30, -110, -54)
+        rssi = 0  # 99, not known or not detectable
+        if 0 <= reply_num <= 31:
+            rssi = _RSSI_DBM[reply_num]
 
         self._read_line()  # eat the 'ok'
         return rssi
@@ -371,12 +394,13 @@ class FONA:
         if self._fona_type == FONA_808_V2:
             # 808 V2 uses GNS commands and doesn't have an explicit 2D/3D fix status.
             # Instead just look for a fix and if found assume it's a 3D fix.
-            self._get_reply(b"AT+CGNSINF")
+            buf = self._get_reply(b"AT+CGNSINF")[1]
 
-            if b"+CGNSINF: " not in self._buf:
+            pos = buf.find(b"+CGNSINF: ")
+            if pos == -1:
                 return False
 
-            status = int(self._buf[10:11].decode("utf-8"))
+            status = buf[pos + 10] - 0x30  # GNSS run status digit
             if status == 1:
                 status = 3  # assume 3D fix
             self._read_line()
@@ -388,7 +412,7 @@ class FONA:
 
     @gps.setter
     def gps(self, gps_on: bool = False) -> bool:
-        if self._fona_type not in (FONA_3G_A, FONA_3G_E, FONA_808_V1, FONA_808_V2):
+        if self._fona_type not in _FONA_GPS_MODELS:
             raise TypeError("GPS unsupported for this FONA module.")
 
         # check if already enabled or disabled
@@ -436,17 +460,17 @@ class FONA:
     @property
     def enable_sms_notification(self) -> bool:
         """Checks if SMS notifications are enabled."""
-        if not self._send_parse_reply(b"AT+CNMI?\r\n", b"+CNMI:", idx=1):
+        if not self._send_parse_reply(b"AT+CNMI?", b"+CNMI:", idx=1):
             return False
         return self._buf
 
     @enable_sms_notification.setter
     def enable_sms_notification(self, enable: bool = True) -> bool:
         if enable:
-            if not self._send_check_reply(b"AT+CNMI=2,1\r\n", reply=REPLY_OK):
+            if not self._send_check_reply(b"AT+CNMI=2,1", reply=REPLY_OK):
                 return False
         else:
-            if not self._send_check_reply(b"AT+CNMI=2,0\r\n", reply=REPLY_OK):
+            if not self._send_check_reply(b"AT+CNMI=2,0", reply=REPLY_OK):
                 return False
         return True
 
@@ -460,7 +484,8 @@ class FONA:
         if self._ri is not None:  # poll the RI pin
             if self._ri.value:
                 return False, False
-        if not self._uart.in_waiting:  # otherwise, poll the UART
+        # otherwise, poll the UART
+        if not self._rx_pending and not self._uart.in_waiting:
             return False, False
 
         self._read_line()  # parse the rcv'd URC
@@ -484,10 +509,10 @@ class FONA:
             raise TypeError("Phone number must be integer")
 
         # select SMS message format, text mode (4.2.2)
-        if not self._send_check_reply(b"AT+CMGF=1", reply=REPLY_OK):
+        if not self._send_check_reply(CMD_CMGF_TEXT, reply=REPLY_OK):
             return False
 
-        self._uart_write(b'AT+CMGS="+' + str(phone_number).encode() + b'"' + b"\r")
+        self._uart_write(b'AT+CMGS="+%d"\r' % phone_number)
         self._read_line()
 
         if self._buf[0] != 62:  # expect '>'
@@ -496,15 +521,15 @@ class FONA:
         self._read_line()
 
         # write out message and ^z
-        self._uart_write((message + chr(26)).encode())
+        self._uart_write(message.encode() + b"\x1a")
 
-        if self._fona_type in (FONA_3G_A, FONA_3G_E):
+        if self._fona_type in _FONA_3G_MODELS:
             self._read_line(200)  # eat first 'CRLF'
             self._read_line(200)  # eat second 'CRLF'
 
         # read +CMGS, wait ~10sec.
         self._read_line(10000)
-        if not "+CMGS" in self._buf:
+        if b"+CMGS" not in self._buf:
             return False
 
         if not self._expect_reply(REPLY_OK):
@@ -516,25 +541,18 @@ class FONA:
 
         :param bool sim_storage: SMS storage on the SIM, otherwise internal storage on FONA chip.
         """
-        if not self._send_check_reply(b"AT+CMGF=1", reply=REPLY_OK):
+        if not self._send_check_reply(CMD_CMGF_TEXT, reply=REPLY_OK):
             raise RuntimeError("Operating mode not supported by FONA module.")
 
-        if sim_storage:  # ask how many SMS are stored
-            if self._send_parse_reply(b"AT+CPMS?", FONA_SMS_STORAGE_SIM + b",", idx=1):
-                return self._buf
-        else:
-            if self._send_parse_reply(
-                b"AT+CPMS?", FONA_SMS_STORAGE_INTERNAL + b",", idx=1
-            ):
-                return self._buf
-
-        self._read_line()  # eat OK
-        if self._send_parse_reply(b"AT+CPMS?", b'"SM",', idx=1):
-            return self._buf
-
-        self._read_line()  # eat OK
-        if self._send_parse_reply(b"AT+CPMS?", b'"SM_P",', idx=1):
+        # ask how many SMS are stored, once, and look for each storage in the reply
+        self._read_line(_FLUSH_TIMEOUT_MS)
+        self._get_reply(CMD_CPMS_QUERY)
+        storage = FONA_SMS_STORAGE_SIM if sim_storage else FONA_SMS_STORAGE_INTERNAL
+        if self._parse_reply(storage + b","):
             return self._buf
+        for storage in _SMS_STORAGE_FALLBACKS:
+            if self._parse_reply(storage):
+                return self._buf
         return 0
 
     def delete_sms(self, sms_slot: int) -> bool:
@@ -542,12 +560,10 @@ class FONA:
 
         :param int sms_slot: SMS SIM or FONA memory slot number.
         """
-        if not self._send_check_reply(b"AT+CMGF=1", reply=REPLY_OK):
+        if not self._send_check_reply(CMD_CMGF_TEXT, reply=REPLY_OK):
             return False
 
-        if not self._send_check_reply(
-            b"AT+CMGD=" + str(sms_slot).encode(), reply=REPLY_OK
-        ):
+        if not self._send_check_reply(b"AT+CMGD=%d" % sms_slot, reply=REPLY_OK):
             return False
 
         return True
@@ -555,10 +571,10 @@ class FONA:
     def delete_all_sms(self) -> bool:
         """Deletes all SMS messages on the FONA SIM."""
         self._read_line()
-        if not self._send_check_reply(b"AT+CMGF=1", reply=REPLY_OK):
+        if not self._send_check_reply(CMD_CMGF_TEXT, reply=REPLY_OK):
             return False
 
-        if self._fona_type in (FONA_3G_A, FONA_3G_E):
+        if self._fona_type in _FONA_3G_MODELS:
             num_sms = self.num_sms()
             for slot in range(0, num_sms):
                 if not self.delete_sms(slot):
@@ -576,12 +592,12 @@ class FONA:
 
         :param int sms_slot: SMS SIM or FONA memory slot number.
         """
-        if not self._send_check_reply(b"AT+CMGF=1", reply=REPLY_OK):
+        if not self._send_check_reply(CMD_CMGF_TEXT, reply=REPLY_OK):
             return False
         if not self._send_check_reply(b"AT+CSDH=1", reply=REPLY_OK):
             return False
 
-        self._uart_write(b"AT+CMGR=" + str(sms_slot).encode() + b"\r\n")
+        self._uart_write(b"AT+CMGR=%d\r\n" % sms_slot)
         self._read_line(1000)
         resp = self._buf
 
@@ -596,10 +612,8 @@ class FONA:
             return False
         sms_len = self._buf
 
-        self._buf = bytearray(sms_len)
-        self._uart.readinto(self._buf)
-        message = bytes(self._buf).decode()
-        self._uart.reset_input_buffer()
+        message = self._uart_read(sms_len).decode()
+        self._reset_input_buffer()
         self._read_line()  # eat 'OK'
 
         return sender, message
@@ -618,7 +632,7 @@ class FONA:
             hostname = bytes(hostname, "utf-8")
 
         if not self._send_check_reply(
-            b'AT+CDNSGIP="' + hostname + b'"\r\n', reply=REPLY_OK
+            b'AT+CDNSGIP="' + hostname + b'"', reply=REPLY_OK
         ):
             return False
 
@@ -632,20 +646,22 @@ class FONA:
         if self._debug:
             print("*** Get socket")
 
+        read_line = self._read_line
         self._uart_write(b"AT+CIPSTATUS\r\n")
-        self._read_line(100)  # OK
-        self._read_line(100)  # table header
+        read_line(100)  # OK
+        read_line(100)  # table header
 
         allocated_socket = 0
         for sock in range(0, FONA_MAX_SOCKETS):  # check if INITIAL state
-            self._read_line(100)
-            self._parse_reply(b"C:", idx=5)
-            if self._buf.strip('"') == "INITIAL" or self._buf.strip('"') == "CLOSED":
+            read_line(100)
+            if not self._parse_reply(b"C:", idx=5):
+                continue
+            if self._buf.strip('"') in ("INITIAL", "CLOSED"):
                 allocated_socket = sock
                 break
         # read out the rest of the responses
         for _ in range(allocated_socket, FONA_MAX_SOCKETS):
-            self._read_line(100)
+            read_line(100)
         if self._debug:
             print("Allocated socket #%d" % allocated_socket)
         return allocated_socket
@@ -659,7 +675,7 @@ class FONA:
             sock_num < FONA_MAX_SOCKETS
         ), "Provided socket exceeds the maximum number of \
                                              sockets for the FONA module."
-        self._uart_write(b"AT+CIPSTATUS=" + str(sock_num).encode() + b"\r\n")
+        self._uart_write(b"AT+CIPSTATUS=%d\r\n" % sock_num)
         self._read_line(100)
 
         self._parse_reply(b"+CIPSTATUS:", idx=3)
@@ -676,19 +692,18 @@ class FONA:
                                              sockets for the FONA module."
         if not self._send_check_reply(b"AT+CIPSTATUS", reply=REPLY_OK, timeout=100):
             return False
-        self._read_line()
+        read_line = self._read_line
+        read_line()
 
-        for state in range(0, sock_num + 1):  # read "C: <n>" for each active connection
-            self._read_line()
-            if state == sock_num:
-                break
+        for _ in range(0, sock_num + 1):  # read "C: <n>" for each active connection
+            read_line()
         self._parse_reply(b"C:", idx=5)
 
         state = self._buf
 
         # eat the rest of the sockets
         for _ in range(sock_num, FONA_MAX_SOCKETS):
-            self._read_line()
+            read_line()
 
         if not "CONNECTED" in state:
             return False
@@ -705,8 +720,8 @@ class FONA:
         ), "Provided socket exceeds the maximum number of \
                                              sockets for the FONA module."
         if not self._send_parse_reply(
-            b"AT+CIPRXGET=4," + str(sock_num).encode(),
-            b"+CIPRXGET: 4," + str(sock_num).encode() + b",",
+            b"AT+CIPRXGET=4,%d" % sock_num,
+            b"+CIPRXGET: 4,%d," % sock_num,
         ):
             return False
         data = self._buf
@@ -736,7 +751,7 @@ class FONA:
                 )
             )
 
-        self._uart.reset_input_buffer()
+        self._reset_input_buffer()
         assert (
             sock_num < FONA_MAX_SOCKETS
         ), "Provided socket exceeds the maximum number of \
@@ -747,12 +762,16 @@ class FONA:
         self._read_line()
 
         # Start connection
-        self._uart_write(b"AT+CIPSTART=" + str(sock_num).encode())
-        if conn_mode == 0:
-            self._uart_write(b',"TCP","')
-        else:
-            self._uart_write(b',"UDP","')
-        self._uart_write(dest.encode() + b'","' + str(port).encode() + b'"\r\n')
+        self._uart_write(
+            b"".join(
+                (
+                    b"AT+CIPSTART=%d" % sock_num,
+                    b',"TCP","' if conn_mode == 0 else b',"UDP","',
+                    dest.encode(),
+                    b'","%d"\r\n' % port,
+                )
+            )
+        )
 
         if not self._expect_reply(REPLY_OK):
             return False
@@ -773,10 +792,10 @@ class FONA:
         ), "Provided socket exceeds the maximum number of \
                                              sockets for the FONA module."
 
-        self._uart_write(b"AT+CIPCLOSE=" + str(sock_num).encode() + b"\r\n")
+        self._uart_write(b"AT+CIPCLOSE=%d\r\n" % sock_num)
         self._read_line(3000)
 
-        if self._fona_type in (FONA_3G_A, FONA_3G_E):
+        if self._fona_type in _FONA_3G_MODELS:
             if not self._expect_reply(REPLY_OK):
                 return False
         else:
@@ -799,14 +818,13 @@ class FONA:
         if self._debug:
             print("* socket read")
 
-        self._uart_write(b"AT+CIPRXGET=2," + str(sock_num).encode() + b",")
-        self._uart_write(str(length).encode() + b"\r\n")
+        self._uart_write(b"AT+CIPRXGET=2,%d,%d\r\n" % (sock_num, length))
         self._read_line()
 
         if not self._parse_reply(b"+CIPRXGET:"):
             return False
 
-        return self._uart.read(length)
+        return self._uart_read(length)
 
     def socket_write(self, sock_num: int, buffer: bytes, timeout: int = 3000) -> bool:
         """Writes bytes to the socket.
@@ -821,32 +839,68 @@ class FONA:
         ), "Provided socket exceeds the maximum number of \
                                              sockets for the FONA module."
 
-        self._uart.reset_input_buffer()
-        self._uart_write(b"AT+CIPSEND=" + str(sock_num).encode())
-        self._uart_write(b"," + str(len(buffer)).encode() + b"\r\n")
+        self._reset_input_buffer()
+        self._uart_write(b"AT+CIPSEND=%d,%d\r\n" % (sock_num, len(buffer)))
         self._read_line()
 
         if self._buf[0] != 62:
             # promoting mark ('>') not found
             return False
 
-        self._uart_write(buffer + b"\r\n")
+        self._write_line(buffer)
         self._read_line(timeout)
 
-        if "SEND OK" not in self._buf.decode():
+        if b"SEND OK" not in self._buf:
             return False
 
         return True
 
     ### UART Reply/Response Helpers ###
 
+    def _uart_read(self, length: int) -> bytes:
+        """UART ``read`` of ``length`` bytes, starting with any bytes
+        ``_read_line`` received past the end of the last line.
+
+        A single ``UART.read`` gives up after the UART's timeout even while a
+        long payload is still arriving, so reads are repeated until ``length``
+        bytes are in or the UART stays quiet for a whole timeout.
+
+        :param int length: Number of bytes to read.
+        """
+        pending = self._rx_pending
+        self._rx_pending = pending[length:]
+        if len(pending) >= length:
+            return pending[:length]
+
+        buf = bytearray(length)
+        size = len(pending)
+        buf[:size] = pending
+        view = memoryview(buf)
+        readinto = self._uart.readinto
+        while size < length:
+            count = readinto(view[size:])
+            if not count:
+                break
+            size += count
+        return bytes(view[:size])
+
+    def _reset_input_buffer(self) -> None:
+        """Discards unread data, both in the UART and left over from ``_read_line``.
+
+        Replies are framed by line endings, so when the previous exchange was
+        read to its end there is nothing to drop and the UART is left alone.
+        """
+        self._rx_pending = b""
+        if self._uart.in_waiting:
+            self._uart.reset_input_buffer()
+
     def _uart_write(self, buffer: bytes) -> None:
         """UART ``write`` with optional debug that prints
         the buffer before sending.
 
         :param bytes buffer: Buffer of bytes to send to the bus.
         """
-        if self._debug:
+        if _DEBUG and self._debug:
             print("\tUARTWRITE ::", buffer.decode())
         self._uart.write(buffer)
 
@@ -859,13 +913,24 @@ class FONA:
         :param bytes send_data: Data received by the FONA module.
         :param str divider: Separator
         """
-        self._read_line()
+        self._read_line(_FLUSH_TIMEOUT_MS)
         self._get_reply(send_data)
 
         if not self._parse_reply(reply_data, divider, idx):
             return False
         return True
 
+    def _write_line(self, data: bytes) -> None:
+        """Writes data followed by CRLF, in a single write for short lines.
+
+        :param bytes data: Line to send to FONA module, without line ending.
+        """
+        if len(data) > _JOIN_MAX:
+            self._uart_write(data)
+            self._uart_write(_CRLF)
+        else:
+            self._uart_write(data + _CRLF)
+
     def _get_reply(
         self,
         data: Optional[bytes] = None,
@@ -880,12 +945,14 @@ class FONA:
         :param bytes suffix: Data to write following ``prefix`` if ``data is not provided
         :param int timeout: Time to wait for UART response.
         """
-        self._uart.reset_input_buffer()
+        self._reset_input_buffer()
 
-        if data is not None:
-            self._uart_write(data + b"\r\n")
+        if data is None:  # one join, rather than concatenating twice
+            self._uart_write(b"".join((prefix, suffix, _CRLF)))
         else:
-            self._uart_write(prefix + suffix + b"\r\n")
+            if isinstance(data, str):
+                data = data.encode()
+            self._write_line(data)
 
         return self._read_line(timeout)
 
@@ -895,61 +962,100 @@ class FONA:
         :param bytes reply: Expected response from FONA module.
         :param str divider: Divider character.
         """
-        parsed_reply = self._buf.find(reply)
-        if parsed_reply == -1:
+        buf = self._buf
+        start = buf.find(reply)
+        if start == -1:
             return False
-        parsed_reply = self._buf[parsed_reply:]
-
-        parsed_reply = self._buf[len(reply) :]
-        parsed_reply = parsed_reply.decode("utf-8")
-
-        parsed_reply = parsed_reply.split(divider)
-        parsed_reply = parsed_reply[idx]
+        start += len(reply)
+
+        # skip to the chosen field, only that one is sliced out and decoded
+        if isinstance(divider, str):
+            divider = divider.encode()
+        for _ in range(idx):
+            start = buf.find(divider, start)
+            if start == -1:
+                raise IndexError("reply field out of range")
+            start += len(divider)
+        end = buf.find(divider, start)
+        field = buf[start:] if end == -1 else buf[start:end]
 
         try:
-            self._buf = int(parsed_reply)
+            self._buf = int(field)
         except ValueError:
-            self._buf = parsed_reply
+            self._buf = field.decode("utf-8")
 
         return True
 
+    # pylint: disable=too-many-locals
     def _read_line(
         self, timeout: int = FONA_DEFAULT_TIMEOUT_MS, multiline: bool = False
     ) -> Tuple[int, bytes]:
         """Reads one or multiple lines into the buffer. Optionally prints the buffer
         after reading.
 
-        :param int timeout: Time to wait for UART serial to reply, in seconds.
-        :param bool multiline: Read multiple lines.
+        :param int timeout: Time to wait for UART serial to reply, in milliseconds.
+        :param bool multiline: Read multiple lines, up to the final ``OK`` or ``ERROR``.
         """
-        self._buf = b""
-        reply_idx = 0
-        while timeout:
-            if reply_idx >= 254:
-                break
-
-            while self._uart.in_waiting:
-                char = self._uart.read(1)
-                if char == b"\r":
-                    continue
-                if char == b"\n":
-                    if reply_idx == 0:  # ignore first '\n'
-                        continue
-                    if not multiline:  # second '\n' is EOL
-                        timeout = 0
+        # bind the names used per iteration to locals
+        uart = self._uart
+        uart_read = uart.read
+        monotonic = time.monotonic
+        line = self._line  # reused for every line, never reallocated
+        size = 0
+
+        deadline = monotonic() + timeout / 1000
+        eol = False
+        # start with whatever the previous read received past its EOL
+        chunk = self._rx_pending
+        while not eol and size < len(line):
+            if not chunk:
+                # drain everything available in one read instead of a byte at a time
+                in_waiting = uart.in_waiting
+                if not in_waiting:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
                         break
-                self._buf += char
-                reply_idx += 1
-
-            if timeout == 0:
-                break
-            timeout -= 1
-            time.sleep(0.001)
-
-        if self._debug:
+                    # block in the UART driver until the next byte, a second at a
+                    # time at most as busio.UART takes no more than 100 seconds,
+                    # then put back the timeout _uart_read relies on
+                    uart_timeout = uart.timeout
+                    uart.timeout = min(remaining, 1.0)
+                    try:
+                        chunk = uart_read(1) or b""
+                    finally:
+                        uart.timeout = uart_timeout
+                    continue
+                chunk = uart_read(in_waiting) or b""
+
+            start = 0
+            if not size:  # ignore leading line breaks
+                start = len(chunk) - len(chunk.lstrip(b"\r\n"))
+            stop = start + len(line) - size  # raw bytes that still fit
+            end = -1
+            if not multiline:  # next '\n' is EOL
+                end = chunk.find(b"\n", start, stop)
+            if end == -1:
+                end = min(stop, len(chunk))
+                data, chunk = chunk[start:end], chunk[end:]
+            else:
+                data, chunk = chunk[start:end], chunk[end + 1 :]
+                eol = True
+
+            data = data.replace(b"\r", b"")
+            line[size : size + len(data)] = data
+            size += len(data)
+            if multiline and size > 2:
+                # a final result code ends the reply, no need to wait out the timeout
+                tail = b"\n" + bytes(line[max(0, size - 7) : size])
+                eol = tail.endswith(b"\nOK\n") or tail.endswith(b"\nERROR\n")
+        # keep what follows for the next read
+        self._rx_pending = chunk
+        self._buf = bytes(line[:size])
+
+        if _DEBUG and self._debug:
             print("\tUARTREAD ::", self._buf.decode())
 
-        return reply_idx, self._buf
+        return size, self._buf
 
     def _send_check_reply(
         self,
@@ -967,19 +1073,56 @@ class FONA:
         :param bytes reply: Expected response from module.
         :param int timeout: Time to wait for UART serial to reply, in seconds.
         """
-        self._read_line()
+        self._read_line(_FLUSH_TIMEOUT_MS)
         if send is None:
-            if not self._get_reply(prefix=prefix, suffix=suffix, timeout=timeout):
-                return False
+            self._get_reply(prefix=prefix, suffix=suffix, timeout=timeout)
         else:
-            if not self._get_reply(send, timeout=timeout):
-                return False
+            self._get_reply(send, timeout=timeout)
 
         if not self._buf == reply:
             return False
 
         return True
 
+    def _send_batch(
+        self, cmds: Tuple[bytes, ...], timeout: int = FONA_DEFAULT_TIMEOUT_MS
+    ) -> bool:
+        """Sends several commands concatenated on one AT command line and
+        validates the single final result code.
+
+        :param tuple cmds: Commands to send, each including the ``AT`` prefix.
+        :param int timeout: Time to wait for UART serial to reply, in milliseconds.
+        """
+        line = [CMD_AT]
+        extended = False
+        for cmd in cmds:
+            if extended:  # extended commands must be followed by a separator
+                line.append(b";")
+            line.append(cmd[2:])
+            extended = cmd[2:3] == b"+"
+        return self._send_check_reply(b"".join(line), reply=REPLY_OK, timeout=timeout)
+
+    def _exec_script(self, steps: Tuple[Tuple[bytes, bytes, int], ...]) -> int:
+        """Sends commands in order, reading the reply lines of each until its
+        expected reply or an error arrives. Stops at the first failing step.
+
+        :param tuple steps: ``(command, reply, timeout)`` of each step, with
+            the timeout to wait for every reply line, in milliseconds.
+        Returns: Number of steps completed, ``len(steps)`` on success.
+        """
+        write_line = self._write_line
+        read_line = self._read_line
+        self._reset_input_buffer()
+        for i, (cmd, reply, timeout) in enumerate(steps):
+            write_line(cmd)
+            while True:
+                size, line = read_line(timeout)
+                if not size or b"ERROR" in line:
+                    return i
+                if line == reply:
+                    break
+        return len(steps)
+
     def _send_check_reply_quoted(
         self,
         prefix: bytes,
@@ -994,8 +1137,6 @@ class FONA:
         :param bytes reply: Expected response from module.
         :param int timeout: Time to expect reply back from FONA, in milliseconds.
         """
-        self._buf = b""
-
         self._get_reply_quoted(prefix, suffix, timeout)
 
         if reply not in self._buf:
@@ -1012,7 +1153,7 @@ class FONA:
         :param bytes prefix: Command ", suffix, ".
         :param int timeout: Time to expect reply back from FONA, in milliseconds.
         """
-        self._uart.reset_input_buffer()
+        self._reset_input_buffer()
 
         self._uart_write(prefix + b'"' + suffix + b'"\r\n')
 
@@ -120,15 +120,12 @@ class socket:
         """Return the remote address to which the socket is connected."""
         return _the_interface.remote_ip(self.socknum)
 
-    def inet_aton(self, ip_string: str) -> bytearray:
+    def inet_aton(self, ip_string: str) -> bytearray:  # pylint: disable=no-self-use
         """Convert an IPv4 address from dotted-quad string format.
 
         :param str ip_string: IP Address, as a dotted-quad string.
         """
-        self._buffer = b""
-        self._buffer = [int(item) for item in ip_string.split(".")]
-        self._buffer = bytearray(self._buffer)
-        return self._buffer
+        return bytearray([int(item) for item in ip_string.split(".")])
 
     def connect(
         self, address: Tuple[str, int], conn_mode: Optional[int] = None
@@ -164,35 +161,33 @@ class socket:
 
         :param int bufsize: maximum number of bytes to receive
         """
-        # print("Socket read", bufsize)
         if bufsize == 0:  # read as much as we can at the moment
+            received = [self._buffer]
             while True:
                 avail = self.available()
                 if avail:
-                    self._buffer += _the_interface.socket_read(self._socknum, avail)
+                    received.append(_the_interface.socket_read(self._socknum, avail))
                 else:
                     break
             gc.collect()
-            ret = self._buffer
+            ret = b"".join(received)
             self._buffer = b""
             gc.collect()
             return ret
-        stamp = time.monotonic()
+        deadline = time.monotonic() + self._timeout
 
         to_read = bufsize - len(self._buffer)
         received = []
         while to_read > 0:
-            # print("Bytes to read:", to_read)
             avail = self.available()
             if avail:
-                stamp = time.monotonic()
                 recv = _the_interface.socket_read(self._socknum, min(to_read, avail))
                 received.append(recv)
                 to_read -= len(recv)
                 gc.collect()
-            if self._timeout > 0 and time.monotonic() - stamp > self._timeout:
+                deadline = time.monotonic() + self._timeout
+            elif self._timeout > 0 and time.monotonic() > deadline:
                 break
-        # print(received)
         self._buffer += b"".join(received)
 
         ret = None
@@ -207,17 +202,20 @@ class socket:
 
     def readline(self) -> Sequence[int]:
         """Attempt to return as many bytes as we can up to but not including '\r\n'"""
-        # print("Socket readline")
-        stamp = time.monotonic()
-        while b"\r\n" not in self._buffer:
+        deadline = time.monotonic() + self._timeout
+        end = self._buffer.find(b"\r\n")
+        while end == -1:
             # there's no line already in there, read some more
             avail = self.available()
             if avail:
+                # only the new bytes, and a CR left at the end, need scanning
+                start = max(len(self._buffer) - 1, 0)
                 self._buffer += _the_interface.socket_read(self._socknum, avail)
-            elif self._timeout > 0 and time.monotonic() - stamp > self._timeout:
+                end = self._buffer.find(b"\r\n", start)
+            elif self._timeout > 0 and time.monotonic() > deadline:
                 self.close()  # Make sure to close socket so that we don't exhaust sockets.
                 raise RuntimeError("Didn't receive full response, failing out")
-        firstline, self._buffer = self._buffer.split(b"\r\n", 1)
+        firstline, self._buffer = self._buffer[:end], self._buffer[end + 2 :]
         gc.collect()
         return firstline
 
@@ -21,7 +21,7 @@ Implementation Notes
 
 """
 from micropython import const
-from .adafruit_fona import FONA, REPLY_OK
+from .adafruit_fona import FONA, CMD_CIPRXGET_MANUAL, REPLY_OK
 
 try:
     from typing import Optional, Tuple, Union
@@ -47,7 +47,8 @@ class FONA3G(FONA):
     :param ~busio.UART uart: FONA UART connection.
     :param ~digitalio.DigitalInOut rst: FONA RST pin.
     :param ~digitalio.DigitalInOut ri: Optional FONA Ring Interrupt (RI) pin.
-    :param bool debug: Enable debugging output.
+    :param bool debug: Enable debugging output. Tracing the UART traffic
+        also needs ``_DEBUG`` set to 1 in ``adafruit_fona.adafruit_fona``.
     """
 
     def __init__(
@@ -62,9 +63,7 @@ class FONA3G(FONA):
 
     def set_baudrate(self, baudrate: int) -> bool:
         """Sets the FONA's UART baudrate."""
-        if not self._send_check_reply(
-            b"AT+IPREX=" + str(baudrate).encode(), reply=REPLY_OK
-        ):
+        if not self._send_check_reply(b"AT+IPREX=%d" % baudrate, reply=REPLY_OK):
             return False
         return True
 
@@ -96,7 +95,7 @@ class FONA3G(FONA):
     @property
     def ue_system_info(self) -> bool:
         """UE System status."""
-        self._send_parse_reply(b"AT+CPSI?\r\n", b"+CPSI: ")
+        self._send_parse_reply(b"AT+CPSI?", b"+CPSI: ")
         if not self._buf == "GSM" or self._buf == "WCDMA":  # 5.15
             return False
         return True
@@ -131,12 +130,19 @@ class FONA3G(FONA):
                     return False
 
                 if apn_user is not None:
-                    self._uart_write(b"AT+CGAUTH=1,1,")
-                    self._uart_write(b'"' + apn_pass.encode() + b'"')
-                    self._uart_write(b',"' + apn_user.encode() + b'"\r\n')
-
-            if not self._get_reply(REPLY_OK, timeout=10000):
-                return False
+                    self._uart_write(
+                        b"".join(
+                            (
+                                b'AT+CGAUTH=1,1,"',
+                                apn_pass.encode(),
+                                b'","',
+                                apn_user.encode(),
+                                b'"\r\n',
+                            )
+                        )
+                    )
+                    if not self._expect_reply(REPLY_OK):
+                        return False
 
             # Enable PDP Context
             if not self._send_check_reply(
@@ -174,9 +180,7 @@ class FONA3G(FONA):
     @tx_timeout.setter
     def tx_timeout(self, timeout: int) -> bool:
         self._read_line()
-        if not self._send_check_reply(
-            b"AT+CIPTIMEOUT=" + str(timeout).encode(), reply=REPLY_OK
-        ):
+        if not self._send_check_reply(b"AT+CIPTIMEOUT=%d" % timeout, reply=REPLY_OK):
             return False
         return True
 
@@ -203,19 +207,20 @@ class FONA3G(FONA):
         if self._debug:
             print("*** Get socket")
 
-        self._read_line()
+        read_line = self._read_line
+        read_line()
         self._uart_write(b"AT+CIPOPEN?\r\n")  # Query which sockets are busy
 
         socket = 0
         for socket in range(0, FONA_MAX_SOCKETS):
-            self._read_line(120000)
+            read_line(120000)
             try:  # SIMCOM5320 lacks a socket connection status, this is a workaround
                 self._parse_reply(b"+CIPOPEN: ", idx=1)
             except IndexError:
                 break
 
         for _ in range(socket, FONA_MAX_SOCKETS):
-            self._read_line()  # eat the rest of '+CIPOPEN' responses
+            read_line()  # eat the rest of '+CIPOPEN' responses
 
         if self._debug:
             print("Allocated socket #%d" % socket)
@@ -239,7 +244,7 @@ class FONA3G(FONA):
                 )
             )
 
-        self._uart.reset_input_buffer()
+        self._reset_input_buffer()
         assert (
             sock_num < FONA_MAX_SOCKETS
         ), "Provided socket exceeds the maximum number of \
@@ -248,14 +253,18 @@ class FONA3G(FONA):
         self._send_check_reply(
             b"AT+CIPSRIP=0", reply=REPLY_OK
         )  # do not show remote ip/port
-        self._send_check_reply(b"AT+CIPRXGET=1", reply=REPLY_OK)  # manually get data
+        self._send_check_reply(CMD_CIPRXGET_MANUAL, reply=REPLY_OK)  # manually get data
 
-        self._uart_write(b"AT+CIPOPEN=" + str(sock_num).encode())
-        if conn_mode == 0:
-            self._uart_write(b',"TCP","')
-        else:
-            self._uart_write(b',"UDP","')
-        self._uart_write(dest.encode() + b'",' + str(port).encode() + b"\r\n")
+        self._uart_write(
+            b"".join(
+                (
+                    b"AT+CIPOPEN=%d" % sock_num,
+                    b',"TCP","' if conn_mode == 0 else b',"UDP","',
+                    dest.encode(),
+                    b'",%d\r\n' % port,
+                )
+            )
+        )
 
         if not self._expect_reply(b"Connect ok"):
             return False
@@ -272,14 +281,15 @@ class FONA3G(FONA):
         ), "Provided socket exceeds the maximum number of \
                                              sockets for the FONA module."
 
+        read_line = self._read_line
         self._uart_write(b"AT+CIPOPEN?\r\n")
         for _ in range(0, sock_num + 1):
-            self._read_line()
+            read_line()
             self._parse_reply(b"+CIPOPEN:", idx=2)
         ip_addr = self._buf
 
         for _ in range(sock_num, FONA_MAX_SOCKETS):
-            self._read_line()  # eat the rest of '+CIPOPEN' responses
+            read_line()  # eat the rest of '+CIPOPEN' responses
         return ip_addr
 
     def socket_write(self, sock_num: int, buffer: bytes, timeout: int = 120000) -> bool:
@@ -295,21 +305,15 @@ class FONA3G(FONA):
         ), "Provided socket exceeds the maximum number of \
                                              sockets for the FONA module."
 
-        self._uart.reset_input_buffer()
+        self._reset_input_buffer()
 
-        self._uart_write(
-            b"AT+CIPSEND="
-            + str(sock_num).encode()
-            + b","
-            + str(len(buffer)).encode()
-            + b"\r\n"
-        )
+        self._uart_write(b"AT+CIPSEND=%d,%d\r\n" % (sock_num, len(buffer)))
         self._read_line()
         if self._buf[0] != 62:
             # promoting mark ('>') not found
             return False
 
-        self._uart_write(buffer + b"\r\n")
+        self._write_line(buffer)
         self._read_line()  # eat 'OK'
 
         self._read_line(3000)  # expect +CIPSEND: rx,tx
@@ -319,7 +323,7 @@ class FONA3G(FONA):
             return False
 
         self._read_line(timeout)
-        if "Send ok" not in self._buf.decode():
+        if b"Send ok" not in self._buf:
             return False
         return True
 
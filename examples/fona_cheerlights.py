@@ -23,7 +23,8 @@ except ImportError:
     raise
 
 # Create a serial connection for the FONA
-uart = busio.UART(board.TX, board.RX)
+# a larger receive buffer holds whole socket reads without overruns
+uart = busio.UART(board.TX, board.RX, receiver_buffer_size=256)
 rst = digitalio.DigitalInOut(board.D4)
 
 # Use this for FONA800 and FONA808